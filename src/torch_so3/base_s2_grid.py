@@ -1,7 +1,10 @@
 """Functions for generating a base grid on the S^2 unit sphere."""
 
+import functools
+import math
 import platform
 import warnings
+from typing import Union
 
 import numpy as np
 import torch
@@ -17,6 +20,8 @@ def uniform_base_grid(
     theta_max: float = 180.0,
     phi_min: float = 0.0,
     phi_max: float = 360.0,
+    dtype: torch.dtype = torch.float32,
+    device: Union[str, torch.device] = "cpu",
 ) -> torch.Tensor:
     """Generate a uniform base grid on the S^2 sphere.
 
@@ -35,6 +40,10 @@ def uniform_base_grid(
         Minimum value for phi in degrees. Default is 0.0.
     phi_max : float, optional
         Maximum value for phi in degrees. Default is 360.0.
+    dtype : torch.dtype, optional
+        Data type of the returned tensor. Default is torch.float32.
+    device : str | torch.device, optional
+        Device to create the returned tensor on. Default is "cpu".
 
     Returns
     -------
@@ -42,40 +51,76 @@ def uniform_base_grid(
         Tensor of shape (N, 2) containing theta and phi values in degrees, where N is
         the number of angles pairs generated.
     """
-    theta_step_rad = np.deg2rad(theta_step)
-    phi_min_rad = np.deg2rad(phi_min)
-    phi_max_rad = np.deg2rad(phi_max)
+    # NOTE: The cached grid is shared, so always hand back a copy
+    angle_pairs = _uniform_base_grid(
+        theta_step=theta_step,
+        theta_min=theta_min,
+        theta_max=theta_max,
+        phi_min=phi_min,
+        phi_max=phi_max,
+    )
+
+    return angle_pairs.to(device=device, dtype=dtype, copy=True)
 
-    # generate uniform set of theta values
-    theta_all = np.arange(
-        theta_min, theta_max + theta_step, theta_step, dtype=np.float64
+
+@functools.lru_cache(maxsize=64)
+def _uniform_base_grid(
+    theta_step: float,
+    theta_min: float,
+    theta_max: float,
+    phi_min: float,
+    phi_max: float,
+) -> torch.Tensor:
+    """Cached float64 CPU implementation of `uniform_base_grid`."""
+    theta_step_rad = math.radians(theta_step)
+    phi_min_rad = math.radians(phi_min)
+    phi_max_rad = math.radians(phi_max)
+
+    # generate uniform set of theta values, including theta_max when it lies on the
+    # grid. An explicit count keeps float drift from changing the number of samples
+    theta_count = math.ceil((theta_max + theta_step - theta_min) / theta_step)
+    theta_all = np.linspace(
+        theta_min,
+        theta_min + (theta_count - 1) * theta_step,
+        theta_count,
+        dtype=np.float64,
     )
-    theta_all = np.deg2rad(theta_all)
 
     # Phi step increment is modulated by the position on the sphere (sin(theta)), but
-    # don't allow it to exceed the maximum step size
+    # don't allow it to exceed the maximum step size. Rings at the poles (sin(theta)
+    # of zero) take the maximum step directly.
     phi_max_step_rad = phi_max_rad - phi_min_rad
-    phi_step_all = np.abs(theta_step_rad / (np.sin(theta_all) + 1e-6))
-    phi_step_all = np.clip(phi_step_all, a_min=None, a_max=phi_max_step_rad)
+    sin_theta_all = np.abs(np.sin(np.deg2rad(theta_all)))
+    phi_step_all = np.full_like(theta_all, phi_max_step_rad)
+    np.divide(
+        theta_step_rad, sin_theta_all, out=phi_step_all, where=sin_theta_all > 1e-12
+    )
+    np.minimum(phi_step_all, phi_max_step_rad, out=phi_step_all)
     if phi_max_step_rad > 0.0:
-        phi_step_all = phi_max_step_rad / np.round(phi_max_step_rad / phi_step_all)
+        # Rings such as sin(theta) = 0.5 land exactly on a half-integer number of
+        # steps, so round halves up with a small tolerance rather than letting the
+        # last bit of sin(theta) decide the tie
+        num_steps_all = np.floor(phi_max_step_rad / phi_step_all + 0.5 + 1e-9)
+        phi_step_all = phi_max_step_rad / num_steps_all
+        phi_count_all = np.ceil(phi_max_step_rad / phi_step_all).astype(np.int64)
     else:
         phi_step_all *= 0.0
+        phi_count_all = np.ones_like(theta_all, dtype=np.int64)
 
-    # Now generate the angle pairs
-    angle_pairs = []
-    for i, phi_step in enumerate(phi_step_all):
-        if phi_min_rad >= phi_max_rad or phi_step <= 0.0:
-            phi_values = np.array([phi_min_rad], dtype=np.float64)
-        else:
-            phi_values = np.arange(phi_min_rad, phi_max_rad, phi_step, dtype=np.float64)
-        theta_values = np.full_like(phi_values, theta_all[i])
-        angle_pairs.append(np.stack([phi_values, theta_values], axis=1))
+    # Convert the per-ring steps back to degrees so the pairs are generated in degrees
+    # directly, rather than converting the whole grid afterwards
+    phi_step_all = np.rad2deg(phi_step_all)
 
-    # Convert back to degrees
-    angle_pairs = np.rad2deg(np.concatenate(angle_pairs))
+    # Now generate the angle pairs for all theta rings at once. The phi index within
+    # each ring is the flat index minus the offset of the ring it belongs to.
+    ring_offsets = np.cumsum(phi_count_all) - phi_count_all
+    phi_index = np.arange(phi_count_all.sum()) - np.repeat(ring_offsets, phi_count_all)
+    phi_values = phi_min + phi_index * np.repeat(phi_step_all, phi_count_all)
+    theta_values = np.repeat(theta_all, phi_count_all)
 
-    return torch.tensor(angle_pairs, dtype=torch.float64)
+    angle_pairs = np.stack([phi_values, theta_values], axis=1)
+
+    return torch.from_numpy(angle_pairs)
 
 
 def healpix_base_grid(
@@ -84,6 +129,8 @@ def healpix_base_grid(
     theta_max: float = 180.0,
     phi_min: float = 0.0,
     phi_max: float = 360.0,
+    dtype: torch.dtype = torch.float32,
+    device: Union[str, torch.device] = "cpu",
 ) -> torch.Tensor:
     """Generate a base grid on the S^2 sphere using HEALPix.
 
@@ -101,6 +148,10 @@ def healpix_base_grid(
         Minimum value for phi in degrees. Default is 0.0.
     phi_max : float, optional
         Maximum value for phi in degrees. Default is 360.0.
+    dtype : torch.dtype, optional
+        Data type of the returned tensor. Default is torch.float32.
+    device : str | torch.device, optional
+        Device to create the returned tensor on. Default is "cpu".
 
     Returns
     -------
@@ -108,52 +159,59 @@ def healpix_base_grid(
         Tensor of shape (N, 2) containing theta and phi values in degrees, where N is
         the number of angles pairs generated.
     """
+    # NOTE: healpy only runs on the CPU, so the cached grid is built there and a copy
+    # is moved to the device at the end
+    angle_pairs = _healpix_base_grid(
+        theta_step=theta_step,
+        theta_min=theta_min,
+        theta_max=theta_max,
+        phi_min=phi_min,
+        phi_max=phi_max,
+    )
+
+    return angle_pairs.to(device=device, dtype=dtype, copy=True)
+
+
+@functools.lru_cache(maxsize=64)
+def _healpix_base_grid(
+    theta_step: float,
+    theta_min: float,
+    theta_max: float,
+    phi_min: float,
+    phi_max: float,
+) -> torch.Tensor:
+    """Cached float64 CPU implementation of `healpix_base_grid`."""
     if platform.system() == "Windows":
         raise ImportError("healpy cannot be installed on Windows systems.")
 
-    theta_step_rad = np.deg2rad(theta_step)
+    theta_step_rad = math.radians(theta_step)
 
-    estimated_num_pixels = int(4 * np.pi / (theta_step_rad * theta_step_rad))
+    estimated_num_pixels = int(4 * math.pi / (theta_step_rad * theta_step_rad))
 
-    # Find the next largest npix value for a valid healpix grid
-    exact_num_pixels = 0
-    nside = np.ceil(np.sqrt(estimated_num_pixels / 12))
-    while nside < 36:
-        exact_num_pixels = 12 * nside**2
-        if exact_num_pixels >= estimated_num_pixels:
-            break
-        nside += 1
+    # Smallest nside whose healpix grid (12 * nside^2 pixels) covers the estimate
+    nside = max(1, math.ceil(math.sqrt(estimated_num_pixels / 12)))
 
-    # Check to make sure the break condition was met
-    if exact_num_pixels < estimated_num_pixels:
+    # Check the grid stays within the supported resolution
+    if nside >= 36:
         raise ValueError("No valid nside found")
+    exact_num_pixels = 12 * nside * nside
 
     # Generate the base grid
-    pixels = np.arange(exact_num_pixels).astype(np.int64)
-    theta_values, phi_values = hp.pix2ang(int(nside), pixels)
-    theta_values = torch.tensor(np.rad2deg(theta_values), dtype=torch.float64)
-    phi_values = torch.tensor(np.rad2deg(phi_values), dtype=torch.float64)
+    pixels = np.arange(exact_num_pixels, dtype=np.int64)
+    theta_values, phi_values = hp.pix2ang(nside, pixels)
+    theta_values = torch.from_numpy(np.rad2deg(theta_values))
+    phi_values = torch.from_numpy(np.rad2deg(phi_values))
 
     # Remove values outside the desired range
-    valid_indices = (
+    # NOTE: nside is capped below 36, so the mask holds at most ~15k elements
+    valid_mask = (
         (theta_values >= theta_min)
         & (theta_values <= theta_max)
         & (phi_values >= phi_min)
         & (phi_values <= phi_max)
     )
-
-    # NOTE: This is doing batched indexing to not exceed memory limits
-    if not torch.all(valid_indices):
-        theta_result = []
-        phi_result = []
-        valid_indices = torch.nonzero(valid_indices).squeeze()
-        for i in range(0, len(valid_indices), 256):
-            batch_indices = valid_indices[i : i + 256]
-            theta_result.append(theta_values[batch_indices])
-            phi_result.append(phi_values[batch_indices])
-
-        theta_values = torch.cat(theta_result)
-        phi_values = torch.cat(phi_result)
+    theta_values = theta_values[valid_mask]
+    phi_values = phi_values[valid_mask]
 
     angle_pairs = torch.stack([phi_values, theta_values], dim=1)
 
@@ -167,6 +225,8 @@ def cartesian_base_grid(
     theta_max: float = 180.0,
     phi_min: float = 0.0,
     phi_max: float = 360.0,
+    dtype: torch.dtype = torch.float32,
+    device: Union[str, torch.device] = "cpu",
 ) -> torch.Tensor:
     """Generate a base grid on the S^2 sphere using a cartesian grid.
 
@@ -186,6 +246,10 @@ def cartesian_base_grid(
         Minimum value for phi in degrees. Default is 0.0.
     phi_max : float, optional
         Maximum value for phi in degrees. Default is 360.0.
+    dtype : torch.dtype, optional
+        Data type of the returned tensor. Default is torch.float32.
+    device : str | torch.device, optional
+        Device to create the returned tensor on. Default is "cpu".
 
     Returns
     -------
@@ -199,6 +263,7 @@ def cartesian_base_grid(
         phi_max,
         phi_step,
         dtype=torch.float64,
+        device=device,
     )
 
     theta_values = torch.arange(
@@ -206,9 +271,16 @@ def cartesian_base_grid(
         theta_max,
         theta_step,
         dtype=torch.float64,
+        device=device,
     )
 
-    grid = torch.meshgrid(phi_values, theta_values, indexing="ij")
-    euler_angles = torch.stack(grid, dim=-1).reshape(-1, 2)
+    # Write the grid directly instead of stacking meshgrid outputs
+    euler_angles = torch.empty(
+        (phi_values.size(0), theta_values.size(0), 2),
+        dtype=torch.float64,
+        device=device,
+    )
+    euler_angles[..., 0] = phi_values[:, None]
+    euler_angles[..., 1] = theta_values
 
-    return euler_angles
+    return euler_angles.view(-1, 2).to(dtype)
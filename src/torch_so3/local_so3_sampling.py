@@ -1,5 +1,6 @@
 """Generate finer angular search around multiple selected Euler angles."""
 
+import math
 from typing import Literal
 
 import torch
@@ -17,6 +18,7 @@ def get_local_high_resolution_angles(
     fine_theta_step: float = 0.1,
     fine_psi_step: float = 0.1,
     base_grid_method: Literal["uniform", "healpix", "cartesian"] = "uniform",
+    dtype: torch.dtype = torch.float32,
 ) -> torch.Tensor:
     """Local orientation refinement from a coarse to fine grid.
 
@@ -40,6 +42,8 @@ def get_local_high_resolution_angles(
         Finer step size for psi in degrees.
     base_grid_method : Literal["uniform", "healpix", "cartesian"]
         Method to generate the base grid.
+    dtype : torch.dtype
+        Data type of the returned tensor. Default is torch.float32.
 
     Returns
     -------
@@ -60,6 +64,7 @@ def get_local_high_resolution_angles(
             psi_min=-coarse_psi_step,
             psi_max=coarse_psi_step + EPS,
             base_grid_method=base_grid_method,
+            dtype=dtype,
         )
     else:
         euler_angles = get_uniform_euler_angles(
@@ -72,6 +77,7 @@ def get_local_high_resolution_angles(
             psi_min=-coarse_psi_step,
             psi_max=coarse_psi_step + EPS,
             base_grid_method=base_grid_method,
+            dtype=dtype,
         )
 
     return euler_angles
@@ -125,15 +131,16 @@ def get_roll_angles(
         representing the sampled rotations.
     """
     # Generate arrays for psi (rotation around Z) and theta (roll angle)
-    psi_values = torch.arange(psi_min, psi_max + EPS, psi_step, dtype=torch.float32)
-    theta_values = torch.arange(
-        theta_min, theta_max + EPS, theta_step, dtype=torch.float32
-    )
+    psi_values = _closed_arange(psi_min, psi_max, psi_step, dtype=torch.float32)
+    theta_values = _closed_arange(theta_min, theta_max, theta_step, dtype=torch.float32)
 
     # Set up the roll axis search
     if roll_axis is None:
         # Search for roll axes by sampling angles in the XY plane
-        roll_angles = torch.arange(0, 180, roll_axis_step, dtype=torch.float32)
+        num_roll = math.ceil(180 / roll_axis_step)
+        roll_angles = torch.linspace(
+            0, (num_roll - 1) * roll_axis_step, num_roll, dtype=torch.float32
+        )
     else:
         # Use the given roll axis [x,y] to determine the roll angle
         # Convert from Cartesian coordinates to angle in the XY plane
@@ -143,35 +150,51 @@ def get_roll_angles(
             roll_angle += 180
         roll_angles = torch.tensor([roll_angle], dtype=torch.float32)
 
-    # Create meshgrid for all dimensions
-    roll_grid, theta_grid, psi_grid = torch.meshgrid(
-        roll_angles, theta_values, psi_values, indexing="ij"
-    )
-
-    # Flatten all grids
-    roll_flat = roll_grid.reshape(-1)
-    theta_flat = theta_grid.reshape(-1)
-    psi_flat = psi_grid.reshape(-1)
-
     # For each combination (I do extrinsic in my head so go backwards):
     # 1. First Euler angle (phi): Rotate to align back with the psi_angle
     # 2. Second Euler angle (theta): Apply theta rotation around roll axis
     # 3. Third Euler angle (psi): Rotate to align with roll axis
+    # Each angle only depends on some of the (roll, theta, psi) axes, so compute it
+    # on those axes and broadcast into the output rather than using a meshgrid.
 
     # Second Euler angle: theta rotation around roll axis
-    theta = theta_flat
+    theta = theta_values[None, :, None]
 
     # Third Euler angle: rotate back to achieve the desired psi rotation
     # We rotate back by (roll_angle - psi_value) to get a net psi rotation
-    psi = 360 - roll_flat
+    psi = (360 - roll_angles)[:, None, None]
 
     # Adjust back-rotation to achieve desired rotation axis angle
-    phi = roll_flat + psi_flat
+    phi = roll_angles[:, None, None] + psi_values[None, None, :]
 
-    # Ensure phi is within [0, 360) range
+    # Ensure phi is within [0, 360) range. A float32 value just below zero wraps to
+    # exactly 360 under the modulo, so fold that back onto 0
     phi = phi % 360
+    phi = torch.where(phi >= 360, phi - 360, phi)
 
-    # Stack the Euler angles
-    all_angles = torch.stack([phi, theta, psi], dim=1)
+    # Write the Euler angles into the output
+    all_angles = torch.empty(
+        (roll_angles.size(0), theta_values.size(0), psi_values.size(0), 3),
+        dtype=torch.float32,
+    )
+    all_angles[..., 0] = phi
+    all_angles[..., 1] = theta
+    all_angles[..., 2] = psi
+    all_angles = all_angles.view(-1, 3)
 
     return all_angles
+
+
+def _closed_arange(
+    start: float, stop: float, step: float, dtype: torch.dtype
+) -> torch.Tensor:
+    """Evenly spaced values from start to stop (inclusive, within EPS) by step.
+
+    The number of samples is computed up front so float drift in the step can
+    never add or drop an endpoint.
+    """
+    num_values = math.floor((stop - start + EPS) / step) + 1
+
+    return torch.linspace(
+        start, start + (num_values - 1) * step, num_values, dtype=dtype
+    )
@@ -1,17 +1,65 @@
 """Generates a set of Euler angles that uniformly samples SO(3) using Hopf fibration."""
 
+import functools
+import math
 import warnings
-from typing import Literal, Optional
+from typing import Callable, Literal, NamedTuple, Optional, Union, overload
 
 import torch
 
 from torch_so3.base_s2_grid import (
+    _healpix_base_grid,
+    _uniform_base_grid,
     cartesian_base_grid,
-    healpix_base_grid,
-    uniform_base_grid,
 )
 
 
+class EulerAnglesSoA(NamedTuple):
+    """NamedTuple child class for the 'get_uniform_euler_angles' "soa" return type."""
+
+    phi: torch.Tensor
+    theta: torch.Tensor
+    psi: torch.Tensor
+
+
+@overload
+def get_uniform_euler_angles(
+    psi_step: float = ...,
+    theta_step: float = ...,
+    phi_step: Optional[float] = ...,
+    phi_min: float = ...,
+    phi_max: float = ...,
+    theta_min: float = ...,
+    theta_max: float = ...,
+    psi_min: float = ...,
+    psi_max: float = ...,
+    base_grid_method: Literal["uniform", "healpix", "cartesian"] = ...,
+    dtype: torch.dtype = ...,
+    device: Union[str, torch.device] = ...,
+    layout: Literal["aos"] = ...,
+    out: Optional[torch.Tensor] = ...,
+) -> torch.Tensor: ...
+
+
+@overload
+def get_uniform_euler_angles(
+    psi_step: float = ...,
+    theta_step: float = ...,
+    phi_step: Optional[float] = ...,
+    phi_min: float = ...,
+    phi_max: float = ...,
+    theta_min: float = ...,
+    theta_max: float = ...,
+    psi_min: float = ...,
+    psi_max: float = ...,
+    base_grid_method: Literal["uniform", "healpix", "cartesian"] = ...,
+    dtype: torch.dtype = ...,
+    device: Union[str, torch.device] = ...,
+    *,
+    layout: Literal["soa"],
+) -> EulerAnglesSoA: ...
+
+
 def get_uniform_euler_angles(
     psi_step: float = 1.5,
     theta_step: float = 2.5,
@@ -23,7 +71,11 @@ def get_uniform_euler_angles(
     psi_min: float = 0.0,
     psi_max: float = 360.0,
     base_grid_method: Literal["uniform", "healpix", "cartesian"] = "uniform",
-) -> torch.Tensor:
+    dtype: torch.dtype = torch.float32,
+    device: Union[str, torch.device] = "cpu",
+    layout: Literal["aos", "soa"] = "aos",
+    out: Optional[torch.Tensor] = None,
+) -> Union[torch.Tensor, EulerAnglesSoA]:
     """Generate sets of uniform Euler angles (ZYZ) using Hopf fibration.
 
     Parameters
@@ -51,61 +103,208 @@ def get_uniform_euler_angles(
     base_grid_method: str, optional
         String literal specifying the method to generate the base grid. Default is
         "uniform". Options are "uniform", "healpix", and "cartesian".
+    dtype: torch.dtype, optional
+        Data type of the returned tensor. Default is torch.float32. Use torch.float64
+        for full double precision angles.
+    device: str | torch.device, optional
+        Device to create the returned angles on. Default is "cpu". Generating the
+        angles directly on the GPU avoids a host-to-device copy of the full grid.
+    layout: str, optional
+        Memory layout of the returned angles. Default is "aos", a single (N, 3)
+        tensor. "soa" returns the phi, theta, and psi columns as three separate
+        contiguous tensors in an EulerAnglesSoA, which is cheaper for consumers
+        reading one angle at a time.
+    out: torch.Tensor, optional
+        Preallocated contiguous (N, 3) tensor with matching dtype and device to write
+        the angles into, e.g. to reuse one buffer across repeated calls. Only
+        supported for the "aos" layout. Default is None, which allocates a new
+        tensor.
 
     Returns
     -------
-    torch.Tensor
+    torch.Tensor | EulerAnglesSoA
         Tensor of shape (N, 3) containing Euler angles in degrees, where N is the
-        number of angles generated.
+        number of angles generated. When layout is "soa", a NamedTuple of three
+        tensors of shape (N,) holding phi, theta, and psi instead.
     """
     # TODO: Validation of inputs, wrapping between zero and 2*pi, etc.
+    if layout not in ("aos", "soa"):
+        raise ValueError(f"Invalid layout {layout}.")
 
-    if base_grid_method == "cartesian":
-        # Handle cartesian_base_grid separately since it has a different signature
-        actual_phi_step = 2.5 if phi_step is None else phi_step
-        base_grid = cartesian_base_grid(
-            theta_step=theta_step,
-            phi_step=actual_phi_step,
-            theta_min=theta_min,
-            theta_max=theta_max,
-            phi_min=phi_min,
-            phi_max=phi_max,
+    if out is not None and layout != "aos":
+        raise ValueError("out is only supported for the 'aos' layout.")
+
+    if base_grid_method not in _BASE_GRID_METHODS:
+        raise ValueError(f"Invalid base grid method {base_grid_method}.")
+
+    # Check if phi_step was specified for non-cartesian methods
+    if base_grid_method != "cartesian" and phi_step is not None:
+        warnings.warn(
+            f"phi_step is being ignored for {base_grid_method} method.",
+            stacklevel=2,
         )
-    else:
-        # Handle uniform and healpix grids
-        if base_grid_method == "uniform":
-            base_grid_mth = uniform_base_grid
-        elif base_grid_method == "healpix":
-            base_grid_mth = healpix_base_grid
-        else:
-            raise ValueError(f"Invalid base grid method {base_grid_method}.")
-
-        # Check if phi_step was specified for non-cartesian methods
-        if phi_step is not None:
-            warnings.warn(
-                f"phi_step is being ignored for {base_grid_method} method.",
-                stacklevel=2,
-            )
-
-        base_grid = base_grid_mth(
-            theta_step=theta_step,
-            theta_min=theta_min,
-            theta_max=theta_max,
-            phi_min=phi_min,
-            phi_max=phi_max,
+        phi_step = None
+
+    # NOTE: The cached base grid is shared between calls, so it is only read from
+    base_grid = _cached_base_grid(
+        base_grid_method, theta_step, theta_min, theta_max, phi_min, phi_max, phi_step
+    ).to(device)
+
+    # Mesh-grid-like operation to include the in-plane rotation. The number of psi
+    # values is fixed up front (half-open range, same rule as torch.arange) and the
+    # values are scaled from an integer index, so float drift cannot change it
+    num_psi = _num_psi(psi_step, psi_min, psi_max)
+    psi_all = torch.arange(num_psi, dtype=torch.float64, device=device)
+    psi_all = (psi_min + psi_step * psi_all).to(dtype)
+
+    # Write the base grid and psi values straight into the output, broadcasting
+    # over a (num_psi, num_base, 3) view rather than tiling intermediate tensors
+    num_base = base_grid.size(0)
+    if layout == "soa":
+        phi_mesh = torch.empty((num_psi, num_base), dtype=dtype, device=device)
+        theta_mesh = torch.empty((num_psi, num_base), dtype=dtype, device=device)
+        psi_mesh = torch.empty((num_psi, num_base), dtype=dtype, device=device)
+        phi_mesh[:] = base_grid[:, 0]
+        theta_mesh[:] = base_grid[:, 1]
+        psi_mesh[:] = psi_all[:, None]
+
+        return EulerAnglesSoA(
+            phi=phi_mesh.view(-1), theta=theta_mesh.view(-1), psi=psi_mesh.view(-1)
         )
 
-    # Mesh-grid-like operation to include the in-plane rotation
-    if psi_min >= psi_max:
-        psi_all = torch.tensor([psi_min], dtype=torch.float64)
+    if out is None:
+        all_angles = torch.empty((num_psi * num_base, 3), dtype=dtype, device=device)
     else:
-        psi_all = torch.arange(psi_min, psi_max, psi_step, dtype=torch.float64)
-
-    psi_mesh = psi_all.repeat_interleave(base_grid.size(0))
-    base_grid = base_grid.repeat(psi_all.size(0), 1)
+        # NOTE: base_grid.device is the requested device resolved to a concrete
+        # index, e.g. "cuda" becomes the current cuda device
+        _check_out(out, (num_psi * num_base, 3), dtype, base_grid.device)
+        all_angles = out
+    all_angles_view = all_angles.view(num_psi, num_base, 3)
 
     # Ordering of angles is (phi, theta, psi) for ZYZ intrinsic rotations
     # psi is the in-plane rotation
-    all_angles = torch.cat([base_grid, psi_mesh[:, None]], dim=1)
+    all_angles_view[..., :2] = base_grid
+    all_angles_view[..., 2] = psi_all[:, None]
 
     return all_angles
+
+
+def count_uniform_euler_angles(
+    psi_step: float = 1.5,
+    theta_step: float = 2.5,
+    phi_step: Optional[float] = None,
+    phi_min: float = 0.0,
+    phi_max: float = 360.0,
+    theta_min: float = 0.0,
+    theta_max: float = 180.0,
+    psi_min: float = 0.0,
+    psi_max: float = 360.0,
+    base_grid_method: Literal["uniform", "healpix", "cartesian"] = "uniform",
+) -> tuple[int, int]:
+    """Count the Euler angles `get_uniform_euler_angles` would generate.
+
+    The angles themselves are not built. Only the (small) base S^2 grid is, and it
+    is cached for a later call generating the angles.
+
+    Parameters
+    ----------
+    psi_step: float, optional
+        Angular step for psi in degrees. Default is 1.5 degrees.
+    theta_step: float, optional
+        Angular step for theta in degrees. Default is 2.5
+        degrees.
+    phi_step: float, optional
+        Angular step for phi rotation in degrees. Only used when base_grid_method is
+        "cartesian". Default is 2.5 degrees.
+    phi_min: float, optional
+        Minimum value for phi in degrees. Default is 0.0.
+    phi_max: float, optional
+        Maximum value for phi in degrees. Default is 360.0.
+    theta_min: float, optional
+        Minimum value for theta in degrees. Default is 0.0.
+    theta_max: float, optional
+        Maximum value for theta in degrees. Default is 180.0.
+    psi_min: float, optional
+        Minimum value for psi in degrees. Default is 0.0.
+    psi_max: float, optional
+        Maximum value for psi in degrees. Default is 360.0.
+    base_grid_method: str, optional
+        String literal specifying the method to generate the base grid. Default is
+        "uniform". Options are "uniform", "healpix", and "cartesian".
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of psi values and number of base grid (phi, theta) pairs. Their
+        product is the number of angles generated.
+    """
+    if base_grid_method not in _BASE_GRID_METHODS:
+        raise ValueError(f"Invalid base grid method {base_grid_method}.")
+
+    if base_grid_method != "cartesian":
+        phi_step = None
+
+    base_grid = _cached_base_grid(
+        base_grid_method, theta_step, theta_min, theta_max, phi_min, phi_max, phi_step
+    )
+
+    return _num_psi(psi_step, psi_min, psi_max), base_grid.size(0)
+
+
+def _num_psi(psi_step: float, psi_min: float, psi_max: float) -> int:
+    """Number of psi values in [psi_min, psi_max), using the torch.arange rule."""
+    if psi_min >= psi_max:
+        return 1
+
+    return math.ceil((psi_max - psi_min) / psi_step)
+
+
+def _check_out(
+    out: torch.Tensor,
+    shape: tuple[int, int],
+    dtype: torch.dtype,
+    device: torch.device,
+) -> None:
+    """Raise a ValueError if `out` cannot hold the requested angles."""
+    if out.shape != shape:
+        raise ValueError(f"out has shape {tuple(out.shape)}, expected {shape}.")
+    if out.dtype != dtype:
+        raise ValueError(f"out has dtype {out.dtype}, expected {dtype}.")
+    if out.device != device:
+        raise ValueError(f"out is on device {out.device}, expected {device}.")
+    if not out.is_contiguous():
+        raise ValueError("out must be contiguous.")
+
+
+# Constructors returning a float64 CPU base grid for each base_grid_method
+_BASE_GRID_METHODS: dict[str, Callable[..., torch.Tensor]] = {
+    "uniform": _uniform_base_grid,
+    "healpix": _healpix_base_grid,
+    "cartesian": functools.partial(cartesian_base_grid, dtype=torch.float64),
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_base_grid(
+    base_grid_method: str,
+    theta_step: float,
+    theta_min: float,
+    theta_max: float,
+    phi_min: float,
+    phi_max: float,
+    phi_step: Optional[float],
+) -> torch.Tensor:
+    """Float64 CPU base grid, cached since it only depends on the S^2 parameters."""
+    grid_kwargs = {
+        "theta_step": theta_step,
+        "theta_min": theta_min,
+        "theta_max": theta_max,
+        "phi_min": phi_min,
+        "phi_max": phi_max,
+    }
+
+    # Handle cartesian_base_grid separately since it has a different signature
+    if base_grid_method == "cartesian":
+        grid_kwargs["phi_step"] = 2.5 if phi_step is None else phi_step
+
+    return _BASE_GRID_METHODS[base_grid_method](**grid_kwargs)
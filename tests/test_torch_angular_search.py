@@ -4,36 +4,112 @@ import platform
 
 import numpy as np
 import pytest
+import torch
 
+from torch_so3.angular_ranges import get_symmetry_ranges
+from torch_so3.base_s2_grid import uniform_base_grid
 from torch_so3.local_so3_sampling import (
     get_local_high_resolution_angles,
     get_roll_angles,
 )
-from torch_so3.uniform_so3_sampling import get_uniform_euler_angles
+from torch_so3.uniform_so3_sampling import (
+    count_uniform_euler_angles,
+    get_uniform_euler_angles,
+)
 
 # TODO: Check actual values of returned tensors
 
 
-def test_get_uniform_euler_angles():
+@pytest.mark.parametrize(
+    "base_grid_method,expected_n",
+    [
+        ("uniform", 1584480),
+        pytest.param(
+            "healpix",
+            1658880,
+            marks=pytest.mark.skipif(
+                platform.system() == "Windows",
+                reason="healpy is not supported on Windows",
+            ),
+        ),
+    ],
+)
+def test_get_uniform_euler_angles(base_grid_method, expected_n):
+    num_psi, num_base = count_uniform_euler_angles(base_grid_method=base_grid_method)
+    assert num_psi * num_base == expected_n
+
     # Test the angle generator
-    angles = get_uniform_euler_angles(base_grid_method="uniform")
-    assert angles.shape == (1584480, 3)
+    angles = get_uniform_euler_angles(base_grid_method=base_grid_method)
+    assert angles.shape == (expected_n, 3)
 
     # Ensure that the angles are within the desired (default) range
-    assert (angles[:, 0] >= 0).all()
-    assert (angles[:, 0] <= 360).all()
-    assert (angles[:, 1] >= 0).all()
-    assert (angles[:, 1] <= 180).all()
-    assert (angles[:, 2] >= 0).all()
-    assert (angles[:, 2] <= 360).all()
+    lo = torch.tensor([0.0, 0.0, 0.0], dtype=angles.dtype)
+    hi = torch.tensor([360.0, 180.0, 360.0], dtype=angles.dtype)
+    assert torch.all((angles >= lo) & (angles <= hi))
 
 
-@pytest.mark.skipif(
-    platform.system() == "Windows", reason="healpy is not supported on Windows"
-)
-def test_get_uniform_euler_angles_healpix():
-    angles = get_uniform_euler_angles(base_grid_method="healpix")
-    assert angles.shape == (1658880, 3)
+def test_get_uniform_euler_angles_dtype():
+    angles = get_uniform_euler_angles(psi_step=4.0, theta_step=6.0)
+    angles_double = get_uniform_euler_angles(
+        psi_step=4.0, theta_step=6.0, dtype=torch.float64
+    )
+    assert angles.dtype == torch.float32
+    assert angles_double.dtype == torch.float64
+    assert angles.shape == angles_double.shape == (103320, 3)
+    assert torch.allclose(angles.double(), angles_double, atol=1e-4)
+
+
+def test_get_uniform_euler_angles_soa():
+    angles = get_uniform_euler_angles(psi_step=4.0, theta_step=6.0)
+    angles_soa = get_uniform_euler_angles(psi_step=4.0, theta_step=6.0, layout="soa")
+    phi, theta, psi = angles_soa
+    assert angles_soa.psi is psi
+    assert phi.shape == theta.shape == psi.shape == (103320,)
+    assert phi.is_contiguous() and theta.is_contiguous() and psi.is_contiguous()
+    assert torch.equal(torch.stack([phi, theta, psi], dim=1), angles)
+
+
+def test_get_uniform_euler_angles_out():
+    angles = get_uniform_euler_angles(psi_step=4.0, theta_step=6.0)
+    out = torch.empty_like(angles)
+    result = get_uniform_euler_angles(psi_step=4.0, theta_step=6.0, out=out)
+    assert result is out
+    assert torch.equal(out, angles)
+
+    with pytest.raises(ValueError):
+        get_uniform_euler_angles(psi_step=4.0, theta_step=6.0, out=out[:-1])
+    with pytest.raises(ValueError):
+        get_uniform_euler_angles(psi_step=4.0, theta_step=6.0, out=out.double())
+    with pytest.raises(ValueError):
+        get_uniform_euler_angles(
+            psi_step=4.0, theta_step=6.0, out=torch.empty_like(out, device="meta")
+        )
+
+
+@pytest.mark.skipif(torch.cuda.device_count() < 2, reason="requires two GPUs")
+def test_get_uniform_euler_angles_out_device_index():
+    out = torch.empty((103320, 3), device="cuda:1")
+    with pytest.raises(ValueError):
+        get_uniform_euler_angles(psi_step=4.0, theta_step=6.0, device="cuda:0", out=out)
+
+
+def test_uniform_base_grid_symmetry_range():
+    ranges = get_symmetry_ranges("C", 4)
+    base_grid = uniform_base_grid(
+        theta_step=2.0,
+        theta_min=ranges.theta_min,
+        theta_max=ranges.theta_max,
+        phi_min=ranges.phi_min,
+        phi_max=ranges.phi_max,
+    )
+    assert base_grid.shape == (2575, 2)
+
+
+def test_cached_base_grid_returns_copy():
+    base_grid = uniform_base_grid(theta_step=6.0)
+    expected = base_grid.clone()
+    base_grid.zero_()
+    assert torch.equal(uniform_base_grid(theta_step=6.0), expected)
 
 
 def test_get_local_high_resolution_angles():
@@ -53,6 +129,11 @@ def test_get_roll_angles():
     roll_angles = get_roll_angles()
     assert roll_angles.shape == (151290, 3)
 
+    # phi is wrapped into [0, 360), including psi values just below zero
+    for angles in (roll_angles, get_roll_angles(psi_step=0.3)):
+        assert (angles[:, 0] >= 0).all()
+        assert (angles[:, 0] < 360).all()
+
     # range tests for angles
     assert (roll_angles[:, 1] >= -10.01).all()
     assert (roll_angles[:, 1] <= 10.01).all()